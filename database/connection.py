@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -11,8 +11,35 @@ SNOWFLAKE_PASSWORD = os.getenv("SNOWFLAKE_PASSWORD")
 SNOWFLAKE_DATABASE = os.getenv("SNOWFLAKE_DATABASE")
 SNOWFLAKE_SCHEMA = os.getenv("SNOWFLAKE_SCHEMA")
 
+# Connection pool settings. Snowflake connections are expensive to open
+# (TLS + authentication), so keep a warm pool sized for concurrent traffic.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "120"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+
+# Compiled-SQL cache entries. The API uses only a handful of distinct statements,
+# so this mostly guards against eviction by ad-hoc queries sharing the engine.
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
+# Built from components so credentials containing URL-reserved characters
+# (e.g. "@" or "/") need no escaping and no connection string is parsed.
+SNOWFLAKE_URL = URL.create(
+    "snowflake",
+    username=SNOWFLAKE_USER,
+    password=SNOWFLAKE_PASSWORD,
+    host=SNOWFLAKE_ACCOUNT,
+    database=f"{SNOWFLAKE_DATABASE}/{SNOWFLAKE_SCHEMA}",
+)
+
 engine = create_engine(
-    f"snowflake://{SNOWFLAKE_USER}:{SNOWFLAKE_PASSWORD}@{SNOWFLAKE_ACCOUNT}/{SNOWFLAKE_DATABASE}/{SNOWFLAKE_SCHEMA}"
+    SNOWFLAKE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    query_cache_size=DB_QUERY_CACHE_SIZE,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
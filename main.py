@@ -1,13 +1,45 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+from anyio import move_on_after, to_thread
 from fastapi import FastAPI
 from dotenv import load_dotenv
-from routers.clients import router as clients_router
+from database.connection import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from routers.clients import client_insert_batcher, router as clients_router, warm_statement_cache
+from routers.responses import JSONBytesResponse
 
 load_dotenv()
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+# Sync endpoints run in AnyIO's worker threads, which default to 40. Allow one
+# thread per pooled connection so the pool, not the threadpool, bounds concurrency.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+
+# Upper bound, in seconds, on warming the SQL statement cache at startup
+DB_WARMUP_TIMEOUT = float(os.getenv("DB_WARMUP_TIMEOUT", "5"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # A slow or unreachable database should not keep the API from starting, so
+    # give up (leaving the worker thread to finish on its own) after the timeout
+    with move_on_after(DB_WARMUP_TIMEOUT) as warmup:
+        try:
+            await to_thread.run_sync(warm_statement_cache, abandon_on_cancel=True)
+        except Exception:
+            logger.warning("Could not warm the SQL statement cache", exc_info=True)
+    if warmup.cancelled_caught:
+        logger.warning("Timed out warming the SQL statement cache")
+    yield
+    await client_insert_batcher.close()
+
+
+app = FastAPI(default_response_class=JSONBytesResponse, lifespan=lifespan)
 
 app.include_router(clients_router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Callable, List, Optional, Set, Tuple
+from starlette.concurrency import run_in_threadpool
+
+
+class InsertBatcher:
+    """
+    Coalesces concurrent single-item writes into batched flushes.
+
+    Items submitted within `max_delay` seconds of the first pending item, up to
+    `max_batch_size` of them, are handed to `flush` together. Each flush runs as
+    its own task, at most `max_concurrent_flushes` at a time, so a slow batch does
+    not hold up the ones behind it. Each submitter awaits only the result for its
+    own item.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 100,
+        max_delay: float = 0.005,
+        max_concurrent_flushes: int = 10,
+    ):
+        """
+        Args:
+            flush (Callable): Blocking function that writes a list of items and
+                returns one result per item, in order. A result that is an
+                Exception instance is raised to that item's submitter.
+            max_batch_size (int): Maximum number of items per flush.
+            max_delay (float): Maximum time, in seconds, to wait for more items.
+            max_concurrent_flushes (int): Maximum number of flushes in progress.
+        """
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_concurrent_flushes = max_concurrent_flushes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queues an item for the next flush and waits for its result.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the app is now running on a different event loop
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._flushes = set()
+            self._worker = loop.create_task(
+                self._run(self._queue, asyncio.Semaphore(self.max_concurrent_flushes))
+            )
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stops the background batching task and settles every pending submission.
+
+        Flushes already in progress are awaited rather than cancelled, since their
+        writes may already be committed and their submitters should see the result.
+        Items not yet handed to a flush fail with a RuntimeError.
+        """
+        if self._worker is not None and self._loop is asyncio.get_running_loop():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, *self._flushes, return_exceptions=True)
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                self._fail(future)
+        self._loop = self._queue = self._worker = None
+        self._flushes = set()
+
+    async def _run(self, queue: asyncio.Queue, flush_slots: asyncio.Semaphore) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await queue.get())
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Wait for a free slot; items keep queueing meanwhile and form the next batch
+                await flush_slots.acquire()
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    self._fail(future)
+                raise
+            task = loop.create_task(self._flush_batch(batch, flush_slots))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush_batch(
+        self, batch: List[Tuple[Any, asyncio.Future]], flush_slots: asyncio.Semaphore
+    ) -> None:
+        try:
+            results = await run_in_threadpool(self.flush, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            flush_slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_exception(RuntimeError("Insert batcher closed"))
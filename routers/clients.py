@@ -1,23 +1,73 @@
+import os
+from collections import Counter
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import insert, select, update, delete
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import bindparam, insert, select, update, delete, func
 from sqlalchemy.orm import Session
-from database.connection import SessionLocal
+from database.connection import DB_MAX_OVERFLOW, DB_POOL_SIZE, SessionLocal
 from models.clients import Client
-from routers.responses import BaseAPIResponse
-from schemas.clients import ClientCreate, ClientUpdate
+from routers.batching import InsertBatcher
+from routers.responses import (
+    CACHE_CONTROL,
+    BaseAPIResponse,
+    JSONBytesResponse,
+    compute_etag,
+    etag_matches,
+)
+from schemas.clients import ClientBulkCreate, ClientCreate, ClientUpdate
 
 router = APIRouter(
     prefix="/clients",
     tags=["clients"],
 )
 
+# Columns exposed by the API, in response order
+CLIENT_COLUMNS = (Client.id, Client.name, Client.email, Client.created_at)
+CLIENT_FIELDS = tuple(column.key for column in CLIENT_COLUMNS)
+
+# Statements are built once at import so every request reuses the same objects
+# and hits SQLAlchemy's compiled-SQL cache. The session is request-scoped, so
+# synchronizing the identity map after UPDATE/DELETE is unnecessary work.
+SELECT_CLIENT_BY_ID = select(*CLIENT_COLUMNS).where(Client.id == bindparam("client_id"))
+SELECT_CLIENTS_PAGE = (
+    select(*CLIENT_COLUMNS, func.count().over().label("total_count"))
+    .offset(bindparam("offset"))
+    .limit(bindparam("limit"))
+)
+COUNT_CLIENTS = select(func.count()).select_from(Client)
+UPDATE_CLIENT_BY_ID = (
+    update(Client)
+    .where(Client.id == bindparam("client_id"))
+    .values(name=bindparam("new_name"), email=bindparam("new_email"))
+    .execution_options(synchronize_session=False)
+)
+UPDATE_CLIENT_BY_ID_RETURNING = UPDATE_CLIENT_BY_ID.returning(*CLIENT_COLUMNS)
+DELETE_CLIENT_BY_ID = (
+    delete(Client)
+    .where(Client.id == bindparam("client_id"))
+    .execution_options(synchronize_session=False)
+)
+
+# Bound once at import to skip the attribute lookup on every insert
+_utcnow = datetime.utcnow
+
+# Upper bound on rows per multi-row INSERT, keeping each statement well within
+# the driver's bind parameter limits
+BULK_INSERT_CHUNK_SIZE = 1000
+
 def get_db_session() -> Session: # type: ignore
     """
     Provides a SQLAlchemy database session for the duration of the request.
     The session is yielded for use in handling requests and automatically
     closed once the request is completed.
 
+    On the pinned FastAPI version the cleanup after `yield` runs as soon as the
+    endpoint returns, before the response is sent, so the connection goes back
+    to the pool without waiting on the client. FastAPI 0.118+ defers this until
+    after the response; when upgrading, declare the dependency with
+    `Depends(get_db_session, scope="function")` to keep the early release.
+
     Yields:
         Session: The SQLAlchemy session object for interacting with the database.
     """
@@ -28,89 +78,266 @@ def get_db_session() -> Session: # type: ignore
         db.close()
 
 
-@router.post("/", response_model=dict, status_code=201)
-def create_client(client: ClientCreate, db: Session = Depends(get_db_session)) -> dict:
+def warm_statement_cache() -> None:
+    """
+    Populates the engine's compiled-SQL cache with the SELECTs used by the read
+    endpoints, so first requests skip compilation.
+
+    Each statement runs once with a client ID that matches no rows. UPDATE and
+    DELETE are deliberately not warmed: on Snowflake they would lock the table
+    against other workers' writes just to save their one-off compile. Parameter
+    names must match the endpoints' exactly, since they are part of the cache key.
+    """
+    with SessionLocal() as db:
+        db.get(Client, -1)
+        db.execute(SELECT_CLIENT_BY_ID, {"client_id": -1})
+        db.execute(SELECT_CLIENTS_PAGE, {"offset": 0, "limit": 1})
+        db.execute(COUNT_CLIENTS)
+
+
+def insert_clients(db: Session, clients: List[ClientCreate]) -> List[dict]:
+    """
+    Inserts clients using multi-row INSERT statements of up to
+    `BULK_INSERT_CHUNK_SIZE` rows each. The caller is responsible for
+    committing or rolling back the transaction.
+
+    Args:
+        db (Session): The database session for the transaction.
+        clients (List[ClientCreate]): The client data to be added. Emails must
+            be unique within the list; callers check this before inserting.
+
+    Returns:
+        List[dict]: The created clients, including their IDs, in input order.
+
+    Raises:
+        ValueError: If an email already belongs to another client, or a created
+            row cannot be read back.
+    """
+    # Each email identifies exactly one input position
+    positions = {c.email: i for i, c in enumerate(clients)}
+
+    created_at = _utcnow()
+    insert_returning = db.get_bind().dialect.insert_returning
+    created = [None] * len(clients)
+
+    for start in range(0, len(clients), BULK_INSERT_CHUNK_SIZE):
+        chunk = clients[start:start + BULK_INSERT_CHUNK_SIZE]
+        stmt = insert(Client).values(
+            [{"name": c.name, "email": c.email, "created_at": created_at} for c in chunk]
+        )
+
+        if insert_returning:
+            rows = db.execute(stmt.returning(*CLIENT_COLUMNS)).all()
+        else:
+            # Snowflake has no RETURNING clause and does not enforce UNIQUE, so
+            # read back every row with these emails; each must match only our insert
+            db.execute(stmt)
+            rows = db.execute(
+                select(*CLIENT_COLUMNS).where(Client.email.in_([c.email for c in chunk]))
+            ).all()
+
+        for row in rows:
+            position = positions[row.email]
+            # A row counts as ours only if it carries this insert's exact created_at.
+            # This assumes the column keeps microseconds through the round trip
+            # (Client.created_at maps to TIMESTAMP_NTZ(9) on Snowflake; a type that
+            # truncates fractional seconds, e.g. TIMESTAMP_NTZ(0) or MySQL DATETIME,
+            # would make every create fail here) and that no other writer stamps
+            # the same email with the same microsecond.
+            if created[position] is not None or row.created_at != created_at:
+                raise ValueError(f"Email {row.email} is already in use")
+            created[position] = dict(zip(CLIENT_FIELDS, row))
+
+    if None in created:
+        raise ValueError("Failed to fetch the newly created clients")
+    return created
+
+
+def insert_client_batch(clients: List[ClientCreate]) -> List[Union[dict, Exception]]:
+    """
+    Inserts a batch of coalesced client creations in its own session.
+
+    Clients with distinct emails are first written together in one transaction.
+    If that fails, each of them is retried on its own so that a single bad row
+    (e.g. a duplicate email) only fails the request that submitted it. Clients
+    repeating an email already seen in the batch always take the one-at-a-time
+    path, so at most one of them can succeed within this batch.
+
+    That guarantee does not extend across batches. Concurrent flushes in this
+    process, or flushes in other worker processes, write in separate
+    transactions that cannot see each other's uncommitted rows. On Snowflake,
+    which does not enforce UNIQUE, two of them creating the same email can
+    therefore both commit.
+
+    Args:
+        clients (List[ClientCreate]): The client data to be added.
+
+    Returns:
+        List[Union[dict, Exception]]: The created client, or the error raised
+        while creating it, for each input client by position.
+    """
+    results: List[Union[dict, Exception, None]] = [None] * len(clients)
+    batched, single = [], []
+    seen = set()
+    for position, client in enumerate(clients):
+        (single if client.email in seen else batched).append(position)
+        seen.add(client.email)
+
+    db = SessionLocal()
+    try:
+        if batched:
+            try:
+                created = insert_clients(db, [clients[position] for position in batched])
+                db.commit()
+                for position, row in zip(batched, created):
+                    results[position] = row
+            except Exception as e:
+                db.rollback()
+                if len(batched) == 1:
+                    results[batched[0]] = e
+                else:
+                    single = sorted(batched + single)
+
+        for position in single:
+            try:
+                results[position] = insert_clients(db, [clients[position]])[0]
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                results[position] = e
+        return results
+    finally:
+        db.close()
+
+
+# Concurrent POST /clients requests arriving within a few milliseconds of each
+# other are written with a single multi-row INSERT. Batches flush in parallel, at
+# most one per pooled connection.
+client_insert_batcher = InsertBatcher(
+    insert_client_batch,
+    max_batch_size=int(os.getenv("CLIENT_INSERT_BATCH_SIZE", "100")),
+    max_delay=int(os.getenv("CLIENT_INSERT_BATCH_DELAY_MS", "5")) / 1000,
+    max_concurrent_flushes=DB_POOL_SIZE + DB_MAX_OVERFLOW,
+)
+
+
+@router.post("/", response_class=JSONBytesResponse, status_code=201)
+async def create_client(client: ClientCreate) -> Response:
     """
     Creates a new client and stores it in the database.
     
     This endpoint takes the client data (name, email), inserts a new client into the
     database, and returns the newly created client with the auto-generated ID.
+    Concurrent requests are coalesced into multi-row INSERTs by `client_insert_batcher`.
 
     Args:
         client (ClientCreate): The client data to be added.
-        db (Session, optional): The database session for the transaction.
 
     Returns:
-        dict: A success response with the created client's details, including the ID.
+        Response: A success response with the created client's details, including the ID.
     """
     try:
-        # Prepare insert statement
-        stmt = insert(Client).values(
-            name=client.name,
-            email=client.email,
-            created_at=datetime.now()
+        created = await client_insert_batcher.submit(client)
+
+        # Return response with new client data
+        return BaseAPIResponse.get_success_response(
+            data=created,
+            message="Client created successfully",
+            status_code=201
+        )
+    except Exception as e:
+        return BaseAPIResponse.get_error_response(
+            error="Failed to create client",
+            details={"exception": str(e)},
+            status_code=400
         )
 
-        # Execute the insert statement
-        db.execute(stmt)
-        db.commit()
 
-        # Get the last inserted client to fetch the auto-generated ID
-        new_client = db.query(Client).filter(Client.email == client.email).first()
+@router.post("/bulk", response_class=JSONBytesResponse, status_code=201)
+def create_clients(clients: ClientBulkCreate, db: Session = Depends(get_db_session)) -> Response:
+    """
+    Creates multiple clients in a single transaction.
 
-        if not new_client:
-            raise Exception("Failed to fetch the newly created client")
+    This endpoint inserts the clients with multi-row INSERT statements instead of
+    one statement per client, so large batches need only a handful of round-trips.
+    Either all clients are created or none are. Lists longer than
+    `MAX_BULK_CLIENTS` are rejected with a 422.
+
+    Args:
+        clients (ClientBulkCreate): The client data to be added.
+        db (Session, optional): The database session for the transaction.
+
+    Returns:
+        Response: A success response with the created clients' details, including their IDs.
+    """
+    # Reject repeated emails before touching the database
+    email_counts = Counter(c.email for c in clients)
+    duplicates = sorted(email for email, count in email_counts.items() if count > 1)
+    if duplicates:
+        return BaseAPIResponse.get_error_response(
+            error="Duplicate emails in request",
+            details={"emails": duplicates},
+            status_code=400
+        )
+
+    try:
+        created = insert_clients(db, clients)
+        db.commit()
 
-        # Return response with new client data
         return BaseAPIResponse.get_success_response(
-            data={
-                "id": new_client.id,
-                "name": new_client.name,
-                "email": new_client.email,
-                "created_at": new_client.created_at.isoformat(),  # Ensure datetime is serialized properly
-            },
-            message="Client created successfully",
+            data=created,
+            message="Clients created successfully",
             status_code=201
         )
     except Exception as e:
         db.rollback()  # Rollback any changes if the operation fails
         return BaseAPIResponse.get_error_response(
-            error="Failed to create client",
+            error="Failed to create clients",
             details={"exception": str(e)},
             status_code=400
         )
 
 
-@router.get("/", response_model=dict, status_code=200)
-def get_clients(db: Session = Depends(get_db_session), limit: int = 10, offset: int = 0) -> dict:
+@router.get("/", response_class=JSONBytesResponse, status_code=200)
+def get_clients(
+    request: Request, db: Session = Depends(get_db_session), limit: int = 10, offset: int = 0
+) -> Response:
     """
     Retrieves a paginated list of all clients from the database.
 
     This endpoint supports pagination by using `limit` (number of clients per page) and 
     `offset` (which page to fetch). It returns a list of clients along with metadata 
-    about the pagination.
+    about the pagination. Responses carry an ETag, and a matching `If-None-Match`
+    header yields an empty 304 response.
 
     Args:
+        request (Request): The incoming request.
         db (Session, optional): The database session.
         limit (int, optional): The number of clients to return per page.
         offset (int, optional): The offset from which to start retrieving clients.
 
     Returns:
-        dict: A paginated response with a list of clients and pagination metadata.
+        Response: A paginated response with a list of clients and pagination metadata.
     """
     try:
-        result = db.query(Client).offset(offset).limit(limit).all()
-        total_count = db.query(Client).count()
-
-        clients = [
-            {
-                "id": client.id,
-                "name": client.name,
-                "email": client.email,
-                "created_at": client.created_at.isoformat(),  # Convert datetime to ISO 8601 string
-            }
-            for client in result
-        ]
+        # Fetch the page and the total row count in a single round-trip, as plain
+        # Core rows rather than ORM objects
+        result = db.execute(SELECT_CLIENTS_PAGE, {"offset": offset, "limit": limit}).all()
+
+        if result:
+            total_count = result[0].total_count
+        elif offset:
+            # The window count is unavailable when paging past the end
+            total_count = db.execute(COUNT_CLIENTS).scalar_one()
+        else:
+            total_count = 0
+
+        etag = compute_etag((offset, limit, total_count, result))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return BaseAPIResponse.get_not_modified_response(etag)
+
+        # zip() stops at the client columns, leaving out the trailing total_count
+        clients = [dict(zip(CLIENT_FIELDS, row)) for row in result]
 
         return BaseAPIResponse.get_paginated_response(
             data=clients,
@@ -119,6 +346,7 @@ def get_clients(db: Session = Depends(get_db_session), limit: int = 10, offset:
             items_per_page=limit,
             has_more=(offset + limit < total_count),
             status_code=200,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
         )
     except Exception as e:
         return BaseAPIResponse.get_error_response(
@@ -128,24 +356,26 @@ def get_clients(db: Session = Depends(get_db_session), limit: int = 10, offset:
         )
 
 
-@router.get("/{client_id}", response_model=dict, status_code=200)
-def get_client(client_id: int, db: Session = Depends(get_db_session)) -> dict:
+@router.get("/{client_id}", response_class=JSONBytesResponse, status_code=200)
+def get_client(client_id: int, request: Request, db: Session = Depends(get_db_session)) -> Response:
     """
     Retrieves a specific client by ID.
 
     This endpoint fetches the client details based on the provided `client_id`. 
-    If the client is not found, it returns a 404 error.
+    If the client is not found, it returns a 404 error. Responses carry an ETag,
+    and a matching `If-None-Match` header yields an empty 304 response.
 
     Args:
         client_id (int): The ID of the client to retrieve.
+        request (Request): The incoming request.
         db (Session, optional): The database session.
 
     Returns:
-        dict: A success response with the client's data, or an error message if not found.
+        Response: A success response with the client's data, or an error message if not found.
     """
     try:
-        # Query for the client by ID
-        client = db.query(Client).filter(Client.id == client_id).first()
+        # Look up the client by primary key, reusing the cached identity lookup
+        client = db.get(Client, client_id)
 
         # Handle case if client is not found
         if not client:
@@ -154,16 +384,18 @@ def get_client(client_id: int, db: Session = Depends(get_db_session)) -> dict:
                 status_code=404,
             )
 
+        # Skip serialization entirely if the caller's cached copy is current
+        values = (client.id, client.name, client.email, client.created_at)
+        etag = compute_etag(values)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return BaseAPIResponse.get_not_modified_response(etag)
+
         # Return the client data
         return BaseAPIResponse.get_success_response(
-            data={
-                "id": client.id,
-                "name": client.name,
-                "email": client.email,
-                "created_at": client.created_at.isoformat(),  # Ensure datetime is serialized properly
-            },
+            data=dict(zip(CLIENT_FIELDS, values)),
             message="Client retrieved successfully",
             status_code=200,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
         )
     except Exception as e:
         # Return error response with exception details
@@ -174,8 +406,8 @@ def get_client(client_id: int, db: Session = Depends(get_db_session)) -> dict:
         )
 
 
-@router.put("/{client_id}", response_model=dict, status_code=200)
-def update_client(client_id: int, client: ClientUpdate, db: Session = Depends(get_db_session)) -> dict:
+@router.put("/{client_id}", response_class=JSONBytesResponse, status_code=200)
+def update_client(client_id: int, client: ClientUpdate, db: Session = Depends(get_db_session)) -> Response:
     """
     Updates an existing client's details.
 
@@ -188,20 +420,26 @@ def update_client(client_id: int, client: ClientUpdate, db: Session = Depends(ge
         db (Session, optional): The database session.
 
     Returns:
-        dict: A success response with the updated client's data, or an error message if not found.
+        Response: A success response with the updated client's data, or an error message if not found.
     """
     try:
         # Update the client in the database
-        db.execute(
-            update(Client)
-            .where(Client.id == client_id)
-            .values(name=client.name, email=client.email)
-        )
+        params = {"client_id": client_id, "new_name": client.name, "new_email": client.email}
+
+        if db.get_bind().dialect.update_returning:
+            # Fetch the updated row in the same round-trip as the update
+            updated_client = db.execute(UPDATE_CLIENT_BY_ID_RETURNING, params).first()
+        else:
+            # Snowflake has no RETURNING clause, so read the row back explicitly,
+            # skipping the read entirely when the update matched nothing
+            result = db.execute(UPDATE_CLIENT_BY_ID, params)
+            updated_client = None
+            if result.rowcount:
+                updated_client = db.execute(
+                    SELECT_CLIENT_BY_ID, {"client_id": client_id}
+                ).first()
         db.commit()
 
-        # Fetch the updated client
-        updated_client = db.query(Client).filter(Client.id == client_id).first()
-
         # Handle case if client is not found
         if not updated_client:
             return BaseAPIResponse.get_error_response(
@@ -211,12 +449,7 @@ def update_client(client_id: int, client: ClientUpdate, db: Session = Depends(ge
 
         # Return the updated client data
         return BaseAPIResponse.get_success_response(
-            data={
-                "id": updated_client.id,
-                "name": updated_client.name,
-                "email": updated_client.email,
-                "created_at": updated_client.created_at.isoformat(),  # Ensure datetime is serialized properly
-            },
+            data=dict(zip(CLIENT_FIELDS, updated_client)),
             message="Client updated successfully",
             status_code=200,
         )
@@ -231,8 +464,8 @@ def update_client(client_id: int, client: ClientUpdate, db: Session = Depends(ge
         )
 
 
-@router.delete("/{client_id}", status_code=204)
-def delete_client(client_id: int, db: Session = Depends(get_db_session)):
+@router.delete("/{client_id}", response_class=JSONBytesResponse, status_code=204)
+def delete_client(client_id: int, db: Session = Depends(get_db_session)) -> Response:
     """
     Deletes a client by ID.
 
@@ -245,28 +478,23 @@ def delete_client(client_id: int, db: Session = Depends(get_db_session)):
         db (Session, optional): The database session.
 
     Returns:
-        dict: A success response with a 204 status code on successful deletion.
+        Response: An empty response with a 204 status code on successful deletion.
     """
     try:
-        # Fetch the client to delete
-        client = db.query(Client).filter(Client.id == client_id).first()
+        # Delete the client in a single statement and use the affected row
+        # count to tell whether it existed
+        result = db.execute(DELETE_CLIENT_BY_ID, {"client_id": client_id})
+        db.commit()
 
         # If client does not exist, return a not found error
-        if not client:
+        if result.rowcount == 0:
             return BaseAPIResponse.get_error_response(
                 error="Client not found",
                 status_code=404,
             )
 
-        # Delete the client from the database
-        db.delete(client)
-        db.commit()
-
         # Return success response (empty body for successful deletion)
-        return BaseAPIResponse.get_success_response(
-            message="Client deleted successfully",
-            status_code=204,
-        )
+        return Response(status_code=204)
     except Exception as e:
         # Rollback any changes in case of error
         db.rollback()
@@ -1,6 +1,56 @@
+import hashlib
+import orjson
+from fastapi import Response
 from fastapi.responses import JSONResponse
 from typing import Any, Dict, Optional, Union
 
+# Naive datetimes are stored as UTC, so serialize them with a "Z" suffix
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# Shared, never-mutated metadata for responses without any, so the common case
+# allocates no dicts beyond the response body itself
+_EMPTY_METADATA: Dict[str, Any] = {}
+_EMPTY_ERROR_METADATA: Dict[str, Any] = {"details": {}}
+
+# Let clients cache reads but revalidate them with If-None-Match on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+class JSONBytesResponse(JSONResponse):
+    """
+    A JSON response that sends pre-encoded bytes as-is and encodes any other
+    content with orjson, so each body is serialized exactly once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def compute_etag(value: Any) -> str:
+    """
+    Computes a strong ETag for a value with a deterministic `repr`, such as a
+    tuple of column values.
+    """
+    return '"%s"' % hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Returns whether an If-None-Match header value matches the given ETag.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
 class BaseAPIResponse:
     """
     A standardized response class for API responses, including status codes.
@@ -13,7 +63,8 @@ class BaseAPIResponse:
         data: Optional[Union[Dict[str, Any], list]] = None,
         status_code: int = 200,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> JSONResponse:
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
         """
         Returns a standardized JSON response.
 
@@ -23,19 +74,21 @@ class BaseAPIResponse:
             data (Optional[Union[Dict, list]]): The response data (if any).
             status_code (int): The HTTP status code.
             metadata (Optional[Dict]): Additional metadata (if any).
+            headers (Optional[Dict]): Additional response headers (if any).
 
         Returns:
-            JSONResponse: A JSON response with a status code.
+            Response: A JSON response with a status code.
         """
-        return JSONResponse(
-            content={
+        body = orjson.dumps(
+            {
                 "status": status,
                 "message": message,
                 "data": data,
-                "metadata": metadata or {},
+                "metadata": _EMPTY_METADATA if metadata is None else metadata,
             },
-            status_code=status_code,
+            option=ORJSON_OPTIONS,
         )
+        return JSONBytesResponse(content=body, status_code=status_code, headers=headers)
 
     @staticmethod
     def get_success_response(
@@ -43,24 +96,33 @@ class BaseAPIResponse:
         message: str = "Success",
         status_code: int = 200,
         metadata: Optional[Dict[str, Any]] = None,
-    ) -> JSONResponse:
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
         """
         Returns a success response.
         """
-        return BaseAPIResponse.get_response("success", message, data, status_code, metadata)
+        return BaseAPIResponse.get_response(
+            "success", message, data, status_code, metadata, headers
+        )
+
+    @staticmethod
+    def get_not_modified_response(etag: str) -> Response:
+        """
+        Returns an empty 304 response for a cached representation that is still current.
+        """
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
 
     @staticmethod
     def get_error_response(
         error: str,
         status_code: int = 400,
         details: Optional[Dict[str, Any]] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """
         Returns an error response.
         """
-        return BaseAPIResponse.get_response(
-            "error", error, None, status_code, {"details": details or {}}
-        )
+        metadata = _EMPTY_ERROR_METADATA if details is None else {"details": details}
+        return BaseAPIResponse.get_response("error", error, None, status_code, metadata)
 
     @staticmethod
     def get_paginated_response(
@@ -70,7 +132,8 @@ class BaseAPIResponse:
         items_per_page: int,
         has_more: bool,
         status_code: int = 200,
-    ) -> JSONResponse:
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
         """
         Returns a paginated response.
         """
@@ -83,5 +146,5 @@ class BaseAPIResponse:
             }
         }
         return BaseAPIResponse.get_response(
-            "success", "Data retrieved successfully", data, status_code, metadata
+            "success", "Data retrieved successfully", data, status_code, metadata, headers
         )
@@ -1,19 +1,28 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, conlist
 from datetime import datetime
 
+# Matches the VARCHAR(255) columns, so oversized values are rejected with a 422
+# before they reach the database (or join a batched INSERT)
+MAX_FIELD_LENGTH = 255
+
 class ClientCreate(BaseModel):
-    name: str
-    email: str
+    name: str = Field(max_length=MAX_FIELD_LENGTH)
+    email: str = Field(max_length=MAX_FIELD_LENGTH)
+
+# Largest list accepted by POST /clients/bulk; bigger payloads get a 422 rather
+# than being held in memory and written in one transaction
+MAX_BULK_CLIENTS = 10000
+
+ClientBulkCreate = conlist(ClientCreate, max_length=MAX_BULK_CLIENTS)
 
 class ClientUpdate(BaseModel):
-    name: str
-    email: str
+    name: str = Field(max_length=MAX_FIELD_LENGTH)
+    email: str = Field(max_length=MAX_FIELD_LENGTH)
 
 class ClientResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     email: str
     created_at: datetime
-
-    class Config:
-        orm_mode = True
\ No newline at end of file
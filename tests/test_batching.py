@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from routers.batching import InsertBatcher
+
+
+# Test case for concurrent submissions sharing a single flush
+def test_insert_batcher_coalesces_submissions():
+    batches = []
+
+    def flush(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def run():
+        batcher = InsertBatcher(flush, max_batch_size=10, max_delay=0.05)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+# Test case for batches being capped at max_batch_size
+def test_insert_batcher_respects_max_batch_size():
+    batches = []
+
+    def flush(items):
+        batches.append(len(items))
+        return items
+
+    async def run():
+        batcher = InsertBatcher(flush, max_batch_size=2, max_delay=0.05)
+        await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.close()
+
+    asyncio.run(run())
+    assert batches == [2, 2, 1]
+
+
+# Test case for a failed item only failing its own submitter
+def test_insert_batcher_propagates_per_item_errors():
+    def flush(items):
+        return [ValueError("bad item") if item == "bad" else item for item in items]
+
+    async def run():
+        batcher = InsertBatcher(flush, max_batch_size=10, max_delay=0.05)
+        results = await asyncio.gather(
+            batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    good, bad = asyncio.run(run())
+    assert good == "good"
+    assert isinstance(bad, ValueError)
+
+
+# Test case for a slow flush not holding up the batches queued behind it
+def test_insert_batcher_flushes_concurrently():
+    release = threading.Event()
+
+    def flush(items):
+        if items == ["slow"]:
+            release.wait(timeout=5)
+        return items
+
+    async def run():
+        batcher = InsertBatcher(flush, max_batch_size=1, max_delay=0, max_concurrent_flushes=2)
+        slow = asyncio.ensure_future(batcher.submit("slow"))
+        fast = await asyncio.wait_for(batcher.submit("fast"), timeout=1)
+        release.set()
+        result = (fast, await slow)
+        await batcher.close()
+        return result
+
+    assert asyncio.run(run()) == ("fast", "slow")
+
+
+# Test case for close reporting in-flight results and failing queued items
+def test_insert_batcher_close_settles_pending_items():
+    release = threading.Event()
+    flushed = []
+
+    def flush(items):
+        flushed.append(list(items))
+        release.wait(timeout=5)
+        return items
+
+    async def run():
+        batcher = InsertBatcher(flush, max_batch_size=1, max_delay=0, max_concurrent_flushes=1)
+        submissions = [asyncio.ensure_future(batcher.submit(i)) for i in ("in-flight", "held", "queued")]
+        await asyncio.sleep(0.05)
+        closing = asyncio.ensure_future(batcher.close())
+        await asyncio.sleep(0.05)
+        release.set()
+        await closing
+        return await asyncio.gather(*submissions, return_exceptions=True)
+
+    in_flight, held, queued = asyncio.run(run())
+    assert in_flight == "in-flight"
+    assert isinstance(held, RuntimeError)
+    assert isinstance(queued, RuntimeError)
+    assert flushed == [["in-flight"]]
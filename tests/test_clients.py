@@ -1,24 +1,36 @@
+from uuid import uuid4
 from fastapi.testclient import TestClient
 from main import app
+from routers.clients import insert_client_batch
+from schemas.clients import MAX_BULK_CLIENTS, ClientCreate
 
 client = TestClient(app)
 
+
+def unique_email(local_part: str) -> str:
+    """
+    Returns an email that no other test run has used, since creating a client
+    with an email that is already stored is rejected.
+    """
+    return f"{local_part}.{uuid4().hex}@example.com"
+
 # Test case for successful client creation
 def test_create_client_success():
-    response = client.post("/clients/", json={"name": "John Doe", "email": "john.doe@example.com"})
+    email = unique_email("john.doe")
+    response = client.post("/clients/", json={"name": "John Doe", "email": email})
     assert response.status_code == 201
     data = response.json()
     assert data["status"] == "success"
     assert "id" in data["data"]
     assert data["data"]["name"] == "John Doe"
-    assert data["data"]["email"] == "john.doe@example.com"
+    assert data["data"]["email"] == email
 
 
 # Test case for retrieving all clients
 def test_get_clients_success():
     # Create some clients
-    client.post("/clients/", json={"name": "Client A", "email": "client.a@example.com"})
-    client.post("/clients/", json={"name": "Client B", "email": "client.b@example.com"})
+    client.post("/clients/", json={"name": "Client A", "email": unique_email("client.a")})
+    client.post("/clients/", json={"name": "Client B", "email": unique_email("client.b")})
     
     response = client.get("/clients/", params={"limit": 10, "offset": 0})
     assert response.status_code == 200
@@ -31,7 +43,8 @@ def test_get_clients_success():
 # Test case for retrieving a single client by ID
 def test_get_client_success():
     # Create a client first
-    response = client.post("/clients/", json={"name": "Jane Doe", "email": "jane.doe@example.com"})
+    email = unique_email("jane.doe")
+    response = client.post("/clients/", json={"name": "Jane Doe", "email": email})
     client_id = response.json()["data"]["id"]
     
     response = client.get(f"/clients/{client_id}")
@@ -40,7 +53,7 @@ def test_get_client_success():
     assert data["status"] == "success"
     assert data["data"]["id"] == client_id
     assert data["data"]["name"] == "Jane Doe"
-    assert data["data"]["email"] == "jane.doe@example.com"
+    assert data["data"]["email"] == email
 
 # Test case for retrieving a client that doesn't exist
 def test_get_client_not_found():
@@ -53,20 +66,21 @@ def test_get_client_not_found():
 # Test case for updating a client successfully
 def test_update_client_success():
     # Create a client first
-    response = client.post("/clients/", json={"name": "John Doe", "email": "john.doe@example.com"})
+    response = client.post("/clients/", json={"name": "John Doe", "email": unique_email("john.doe")})
     client_id = response.json()["data"]["id"]
     
     # Update client
-    response = client.put(f"/clients/{client_id}", json={"name": "John Updated", "email": "john.updated@example.com"})
+    email = unique_email("john.updated")
+    response = client.put(f"/clients/{client_id}", json={"name": "John Updated", "email": email})
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "success"
     assert data["data"]["name"] == "John Updated"
-    assert data["data"]["email"] == "john.updated@example.com"
+    assert data["data"]["email"] == email
 
 # Test case for updating a non-existent client
 def test_update_client_not_found():
-    response = client.put("/clients/999999", json={"name": "Non Existent", "email": "non.existent@example.com"})
+    response = client.put("/clients/999999", json={"name": "Non Existent", "email": unique_email("non.existent")})
     assert response.status_code == 404
     data = response.json()
     assert data["status"] == "error"
@@ -75,7 +89,7 @@ def test_update_client_not_found():
 # Test case for successful client deletion
 def test_delete_client_success():
     # Create a client first
-    response = client.post("/clients/", json={"name": "Client To Delete", "email": "delete.me@example.com"})
+    response = client.post("/clients/", json={"name": "Client To Delete", "email": unique_email("delete.me")})
     client_id = response.json()["data"]["id"]
     
     response = client.delete(f"/clients/{client_id}")
@@ -88,3 +102,92 @@ def test_delete_client_not_found():
     data = response.json()
     assert data["status"] == "error"
     assert data["message"] == "Client not found"
+
+# Test case for creating several clients in one request
+def test_create_clients_bulk_success():
+    emails = [unique_email("bulk.a"), unique_email("bulk.b")]
+    payload = [
+        {"name": "Bulk A", "email": emails[0]},
+        {"name": "Bulk B", "email": emails[1]},
+    ]
+    response = client.post("/clients/bulk", json=payload)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["status"] == "success"
+    assert [c["email"] for c in data["data"]] == emails
+    assert all("id" in c for c in data["data"])
+
+# Test case for revalidating a cached client with its ETag
+def test_get_client_not_modified():
+    response = client.post("/clients/", json={"name": "Cached Client", "email": unique_email("cached")})
+    client_id = response.json()["data"]["id"]
+
+    response = client.get(f"/clients/{client_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = client.get(f"/clients/{client_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+# Test case for rejecting repeated emails in a bulk request
+def test_create_clients_bulk_duplicate_emails():
+    email = unique_email("bulk.dup")
+    payload = [
+        {"name": "Dup A", "email": email},
+        {"name": "Dup B", "email": email},
+    ]
+    response = client.post("/clients/bulk", json=payload)
+    assert response.status_code == 400
+    data = response.json()
+    assert data["status"] == "error"
+    assert data["metadata"]["details"]["emails"] == [email]
+
+# Test case for rejecting a name longer than the column allows
+def test_create_client_name_too_long():
+    response = client.post("/clients/", json={"name": "x" * 256, "email": unique_email("too.long")})
+    assert response.status_code == 422
+
+# Test case for rejecting a bulk request over the size limit
+def test_create_clients_bulk_too_large():
+    payload = [{"name": "Too Many", "email": f"too.many.{i}@example.com"} for i in range(MAX_BULK_CLIENTS + 1)]
+    response = client.post("/clients/bulk", json=payload)
+    assert response.status_code == 422
+
+# Test case for rejecting a second client with an email that is already stored
+def test_create_client_duplicate_email():
+    email = unique_email("taken")
+    response = client.post("/clients/", json={"name": "First", "email": email})
+    assert response.status_code == 201
+
+    response = client.post("/clients/", json={"name": "Second", "email": email})
+    assert response.status_code == 400
+    data = response.json()
+    assert data["status"] == "error"
+    assert data["message"] == "Failed to create client"
+
+# Test case for a repeated email within one batch of coalesced creates
+def test_insert_client_batch_repeated_email():
+    repeated, other = unique_email("batch.repeated"), unique_email("batch.other")
+    results = insert_client_batch([
+        ClientCreate(name="First", email=repeated),
+        ClientCreate(name="Second", email=repeated),
+        ClientCreate(name="Other", email=other),
+    ])
+    assert results[0]["email"] == repeated
+    assert results[0]["name"] == "First"
+    assert isinstance(results[1], Exception)
+    assert results[2]["email"] == other
+
+# Test case for retrying a failed batch one client at a time
+def test_insert_client_batch_falls_back_after_failure():
+    taken = unique_email("batch.taken")
+    response = client.post("/clients/", json={"name": "Taken", "email": taken})
+    assert response.status_code == 201
+
+    emails = [unique_email("batch.a"), taken, unique_email("batch.b")]
+    results = insert_client_batch([ClientCreate(name="Batch", email=email) for email in emails])
+    assert results[0]["email"] == emails[0]
+    assert isinstance(results[1], Exception)
+    assert results[2]["email"] == emails[2]
+    assert results[0]["id"] != results[2]["id"]